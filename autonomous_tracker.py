@@ -4,21 +4,70 @@ Autonomous Agent Task Tracker
 Enhanced with dependencies, ROI scoring, and state machine
 """
 
+import argparse
+import atexit
+import queue
 import sqlite3
 import sys
+import threading
 import time
-from datetime import datetime
+from contextlib import contextmanager
 from pathlib import Path
-from enum import Enum
+from enum import Enum, IntEnum
 
 DB_PATH = Path(__file__).parent / "tasks.db"
 
-class TaskStatus(Enum):
-    PENDING = "pending"      # Not yet ready (dependencies not met)
-    ELIGIBLE = "eligible"   # Ready to work on
-    IN_PROGRESS = "in_progress"
-    REVIEW = "review"        # Awaiting verification
-    DONE = "completed"
+# Bumped whenever init_db() gains a data migration (stored in PRAGMA user_version)
+SCHEMA_VERSION = 5
+
+# Connections: SQLite serializes writers but lets readers run alongside
+# them under WAL, so writes go through a single connection behind a lock
+# while reads check a connection out of a bounded queue. Reader slots
+# start out as None and are opened on first checkout, so short CLI runs
+# only pay for the connections they actually use.
+READER_POOL_SIZE = 4
+STATEMENT_CACHE_SIZE = 256
+_READERS = None
+_WRITER = None
+_POOL_LOCK = threading.Lock()
+_WRITER_LOCK = threading.RLock()
+_WRITER_DEPTH = 0  # Nested get_writer() checkouts held by the lock's owner
+_OPENED = []
+
+# Applied to every pooled connection as it is opened. WAL lets readers and
+# the writer proceed concurrently; busy_timeout waits out a competing
+# writer instead of failing straight away with "database is locked".
+_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA foreign_keys=ON",
+]
+
+# Stored in tasks.status as small integers; _STATUS_NAMES and
+# _STATUS_EMOJI are indexed by the code for display.
+class TaskStatus(IntEnum):
+    PENDING = 0      # Not yet ready (dependencies not met)
+    ELIGIBLE = 1     # Ready to work on
+    IN_PROGRESS = 2
+    REVIEW = 3       # Awaiting verification
+    DONE = 4
+
+_STATUS_NAMES = ("pending", "eligible", "in_progress", "review", "completed")
+_STATUS_EMOJI = ("⏳", "✅", "🔄", "👀", "✓")
+
+def _known_status(status):
+    return isinstance(status, int) and 0 <= status < len(_STATUS_NAMES)
+
+def status_name(status):
+    """Display name for a stored status; values that are not TaskStatus codes are shown as stored"""
+    return _STATUS_NAMES[status] if _known_status(status) else str(status)
+
+def status_code(name):
+    """TaskStatus for a status name such as "completed" (ValueError if unknown)"""
+    return TaskStatus(_STATUS_NAMES.index(name))
 
 class Priority(Enum):
     LOW = "low"
@@ -26,187 +75,467 @@ class Priority(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+# ROI = impact × urgency ÷ effort, as a SQL expression (float division,
+# effort clamped to 1 so a zero effort score cannot divide by zero).
+# Exposed as the generated tasks.roi_score column.
+_ROI_SQL = "(impact_score * urgency_score * 1.0 / MAX(effort_score, 1))"
+
+# Statements shared between helpers. Keeping one copy of the text means
+# every caller hits the same entry in a connection's statement cache.
+_SQL_SET_STATUS = 'UPDATE tasks SET status = ? WHERE id = ?'
+_SQL_GET_TASK = 'SELECT * FROM tasks WHERE id = ?'
+_SQL_MARK_GOAL_TASKED = 'UPDATE goals SET tasks_generated = TRUE, updated_at = ? WHERE id = ?'
+_SQL_ADD_PREREQ = 'INSERT OR IGNORE INTO task_prereqs (task_id, prereq_id) VALUES (?, ?)'
+# Correlated subquery: prerequisites of the outer tasks row that are not
+# completed yet (binds the DONE status). A missing prerequisite still blocks.
+_SQL_BLOCKING_PREREQS = '''
+    SELECT tp.prereq_id FROM task_prereqs tp
+    LEFT JOIN tasks p ON p.id = tp.prereq_id
+    WHERE tp.task_id = tasks.id
+      AND (p.status IS NULL OR p.status != ?)
+'''
+# Same check for a single task id, listing the blocking prerequisites
+_SQL_PENDING_PREREQS = '''
+    SELECT tp.prereq_id FROM task_prereqs tp
+    LEFT JOIN tasks p ON p.id = tp.prereq_id
+    WHERE tp.task_id = ?
+      AND (p.status IS NULL OR p.status != ?)
+    ORDER BY tp.prereq_id
+'''
+_SQL_INSERT_APPROVAL = '''
+    INSERT INTO approvals (
+        task_id, status, session_key, requested_at_ms,
+        created_at, updated_at
+    ) VALUES (?, 'pending', ?, ?, ?, ?)
+'''
+_SQL_RESOLVE_APPROVAL = '''
+    UPDATE approvals
+    SET status = ?, decided_at_ms = ?, decision_text = ?, updated_at = ?
+    WHERE task_id = ? AND status = 'pending'
+'''
+_SQL_UPSERT_INBOUND = '''
+    INSERT INTO inbound_state (session_key, last_ts, updated_at)
+    VALUES (?, ?, ?)
+    ON CONFLICT(session_key) DO UPDATE SET
+        last_ts = excluded.last_ts,
+        updated_at = excluded.updated_at
+'''
+_SQL_UPSERT_APPROVAL_STATE = '''
+    INSERT INTO approval_state (session_key, last_batch_sent_ms, updated_at)
+    VALUES (?, ?, ?)
+    ON CONFLICT(session_key) DO UPDATE SET
+        last_batch_sent_ms = excluded.last_batch_sent_ms,
+        updated_at = excluded.updated_at
+'''
+
+_now_cache = (None, "")
+
+def _now_iso():
+    """Local timestamp in ISO-8601 form, reusing the formatted seconds part"""
+    global _now_cache
+    t = time.time()
+    sec = int(t)
+    cached_sec, prefix = _now_cache
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(sec))
+        _now_cache = (sec, prefix)
+    return f"{prefix}.{int((t - sec) * 1_000_000):06d}"
+
+def _open_connection(read_only=False):
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    if read_only:
+        conn.execute("PRAGMA query_only=true")
+    _OPENED.append(conn)
+    return conn
+
+def _init_readers():
+    global _READERS
+    with _POOL_LOCK:
+        if _READERS is None:
+            readers = queue.Queue(maxsize=READER_POOL_SIZE)
+            for _ in range(READER_POOL_SIZE):
+                readers.put(None)
+            _READERS = readers
+    return _READERS
+
+def close_pool():
+    """Close the writer and every pooled reader (registered with atexit)"""
+    global _READERS, _WRITER
+    with _POOL_LOCK, _WRITER_LOCK:
+        while _OPENED:
+            _OPENED.pop().close()
+        _READERS = None
+        _WRITER = None
+
+atexit.register(close_pool)
+
+@contextmanager
+def get_reader():
+    """Check a read-only connection out of the pool for a with-block"""
+    readers = _READERS or _init_readers()
+    conn = readers.get()
+    if conn is None:
+        conn = _open_connection(read_only=True)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        readers.put(conn)
+
+@contextmanager
+def get_writer():
+    """Hold the single writer connection for the duration of a with-block
+
+    Checkouts nest: a helper called while the writer is held joins the
+    caller's transaction, and only the outermost checkout rolls back a
+    transaction left open.
+    """
+    global _WRITER, _WRITER_DEPTH
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = _open_connection()
+        _WRITER_DEPTH += 1
+        try:
+            yield _WRITER
+        finally:
+            _WRITER_DEPTH -= 1
+            if not _WRITER_DEPTH and _WRITER.in_transaction:
+                _WRITER.rollback()
+
+@contextmanager
+def write_transaction():
+    """Run a with-block as a single IMMEDIATE transaction on the writer
+
+    Inside an enclosing transaction the block simply joins it.
+    """
+    with get_writer() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        yield conn
+        conn.execute('COMMIT')
+
+# Tasks table in its current shape. {table} is filled in so the status
+# migration can build the replacement next to the legacy table.
+_TASKS_TABLE = f'''
+    CREATE TABLE IF NOT EXISTS {{table}} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        status INTEGER DEFAULT 0,  -- TaskStatus code
+        priority TEXT DEFAULT 'medium',
+        
+        -- Dependencies
+        prerequisites TEXT,  -- Comma-separated task IDs (mirrored in task_prereqs)
+        
+        -- ROI Scoring (0-10 scale)
+        impact_score INTEGER DEFAULT 5,      -- Revenue/user impact
+        urgency_score INTEGER DEFAULT 5,    -- Time sensitivity
+        effort_score INTEGER DEFAULT 5,     -- 1=hours, 10=weeks
+        
+        -- Auto-complete rules
+        auto_complete BOOLEAN DEFAULT FALSE,
+        completion_criteria TEXT,          -- What defines "done"
+        
+        -- Metadata
+        created_at TEXT,
+        updated_at TEXT,
+        started_at TEXT,
+        completed_at TEXT,
+        created_by TEXT DEFAULT 'agent',
+
+        roi_score REAL GENERATED ALWAYS AS {_ROI_SQL} VIRTUAL
+    )
+'''
+
+# Task dependency edges (task_id waits on prereq_id)
+_PREREQS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS task_prereqs (
+        task_id INTEGER NOT NULL,
+        prereq_id INTEGER NOT NULL,
+        PRIMARY KEY (task_id, prereq_id),
+        FOREIGN KEY (task_id) REFERENCES tasks(id)
+    )
+'''
+
+# Full-text index over task titles/descriptions, kept in sync by triggers
+_FTS_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id'
+    )
+'''
+
+# Full schema, applied by init_db() as one script in a single transaction
+_SCHEMA = f'''
+    -- Main tasks table with autonomy fields
+    {_TASKS_TABLE.format(table='tasks')};
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks(status, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_roi ON tasks(status, roi_score DESC);
+
+    {_PREREQS_TABLE};
+    CREATE INDEX IF NOT EXISTS idx_task_prereqs_prereq ON task_prereqs(prereq_id);
+
+    {_FTS_TABLE};
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END;
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END;
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END;
+
+    -- Decision log for learning
+    CREATE TABLE IF NOT EXISTS decision_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER,
+        decision TEXT,
+        reasoning TEXT,
+        outcome TEXT,  -- success, failed, blocked
+        created_at TEXT,
+        FOREIGN KEY (task_id) REFERENCES tasks(id)
+    );
+
+    -- Event log for webhook triggers
+    CREATE TABLE IF NOT EXISTS event_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_type TEXT,
+        payload TEXT,
+        handled BOOLEAN DEFAULT FALSE,
+        created_at TEXT
+    );
+
+    -- Goals table for high-level business objectives
+    CREATE TABLE IF NOT EXISTS goals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description TEXT NOT NULL,
+        status TEXT DEFAULT 'active',
+        source TEXT DEFAULT 'user',
+        tasks_generated BOOLEAN DEFAULT FALSE,
+        created_at TEXT,
+        updated_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_goals_active_untasked ON goals(status, tasks_generated);
+
+    -- Manager approvals for sensitive actions
+    CREATE TABLE IF NOT EXISTS approvals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        status TEXT DEFAULT 'pending',
+        session_key TEXT,
+        requested_at_ms INTEGER,
+        decided_at_ms INTEGER,
+        decision_text TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        FOREIGN KEY (task_id) REFERENCES tasks(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_approvals_pending ON approvals(status, requested_at_ms);
+    CREATE INDEX IF NOT EXISTS idx_approvals_task ON approvals(task_id);
+
+    -- Inbound message tracking (e.g., Telegram goal intake)
+    CREATE TABLE IF NOT EXISTS inbound_state (
+        session_key TEXT PRIMARY KEY,
+        last_ts INTEGER DEFAULT 0,
+        updated_at TEXT
+    );
+
+    -- Approval batching state per session
+    CREATE TABLE IF NOT EXISTS approval_state (
+        session_key TEXT PRIMARY KEY,
+        last_batch_sent_ms INTEGER DEFAULT 0,
+        updated_at TEXT
+    );
+'''
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Main tasks table with autonomy fields
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            status TEXT DEFAULT 'pending',
-            priority TEXT DEFAULT 'medium',
-            
-            -- Dependencies
-            prerequisites TEXT,  -- JSON array of task IDs
-            
-            -- ROI Scoring (0-10 scale)
-            impact_score INTEGER DEFAULT 5,      -- Revenue/user impact
-            urgency_score INTEGER DEFAULT 5,    -- Time sensitivity
-            effort_score INTEGER DEFAULT 5,     -- 1=hours, 10=weeks
-            
-            -- Auto-complete rules
-            auto_complete BOOLEAN DEFAULT FALSE,
-            completion_criteria TEXT,          -- What defines "done"
-            
-            -- Metadata
-            created_at TEXT,
-            updated_at TEXT,
-            started_at TEXT,
-            completed_at TEXT,
-            created_by TEXT DEFAULT 'agent'
+    with get_writer() as conn:
+        # Bring a legacy database up to date first, so the schema script
+        # only ever sees tables that already have their current shape
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks'").fetchone():
+            _migrate(conn)
+        conn.executescript(
+            f'BEGIN IMMEDIATE; {_SCHEMA} PRAGMA user_version = {SCHEMA_VERSION}; COMMIT;'
         )
-    ''')
-    
-    # Decision log for learning
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS decision_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER,
-            decision TEXT,
-            reasoning TEXT,
-            outcome TEXT,  -- success, failed, blocked
-            created_at TEXT,
-            FOREIGN KEY (task_id) REFERENCES tasks(id)
-        )
-    ''')
-    
-    # Event log for webhook triggers
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS event_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_type TEXT,
-            payload TEXT,
-            handled BOOLEAN DEFAULT FALSE,
-            created_at TEXT
-        )
-    ''')
-    
-    # Goals table for high-level business objectives
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS goals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            description TEXT NOT NULL,
-            status TEXT DEFAULT 'active',
-            source TEXT DEFAULT 'user',
-            tasks_generated BOOLEAN DEFAULT FALSE,
-            created_at TEXT,
-            updated_at TEXT
-        )
-    ''')
 
-    # Manager approvals for sensitive actions
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS approvals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER NOT NULL,
-            status TEXT DEFAULT 'pending',
-            session_key TEXT,
-            requested_at_ms INTEGER,
-            decided_at_ms INTEGER,
-            decision_text TEXT,
-            created_at TEXT,
-            updated_at TEXT,
-            FOREIGN KEY (task_id) REFERENCES tasks(id)
-        )
-    ''')
+def _migrate(conn):
+    """Bring a database created by an older version up to SCHEMA_VERSION
 
-    # Inbound message tracking (e.g., Telegram goal intake)
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS inbound_state (
-            session_key TEXT PRIMARY KEY,
-            last_ts INTEGER DEFAULT 0,
-            updated_at TEXT
-        )
-    ''')
+    Each step only relies on tables it creates itself; the indexes and
+    triggers are (re)created by the schema script that runs afterwards.
+    """
+    c = conn.cursor()
+    version = c.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    # Rebuilding tasks drops the table other tables reference, which
+    # foreign key enforcement would refuse (and cannot be toggled mid-transaction)
+    c.execute('PRAGMA foreign_keys=OFF')
+    try:
+        c.execute('BEGIN IMMEDIATE')
+        if not c.execute("SELECT 1 FROM pragma_table_info('tasks') WHERE name = 'prerequisites'").fetchone():
+            # Created by the standalone task_tracker: one rebuild gives the
+            # table its current shape, leaving only the full-text backfill
+            _convert_status_codes(c, _PLAIN_TASK_COLUMNS)
+            _backfill_fts(c)
+        else:
+            if version < 1:
+                c.execute(_PREREQS_TABLE)
+                _migrate_prerequisites(c)
+            if version < 2:
+                _promote_stranded_tasks(c)
+            if version < 3:
+                _add_roi_column(c)
+            if version < 4:
+                _backfill_fts(c)
+            if version < 5:
+                _convert_status_codes(c)
+        c.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        c.execute('COMMIT')
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        c.execute('PRAGMA foreign_keys=ON')
 
-    # Approval batching state per session
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS approval_state (
-            session_key TEXT PRIMARY KEY,
-            last_batch_sent_ms INTEGER DEFAULT 0,
-            updated_at TEXT
-        )
-    ''')
+def _migrate_prerequisites(c):
+    """Backfill task_prereqs from the legacy comma-separated prerequisites column"""
+    c.execute("SELECT id, prerequisites FROM tasks WHERE prerequisites != ''")
+    edges = [
+        (task_id, int(p))
+        for task_id, prereqs in c.fetchall()
+        for p in prereqs.split(',') if p.strip()
+    ]
+    c.executemany(_SQL_ADD_PREREQ, edges)
 
-    conn.commit()
-    conn.close()
 
-def get_connection():
-    return sqlite3.connect(DB_PATH)
+def _promote_stranded_tasks(c):
+    """Promote pending tasks whose prerequisites were all completed
+
+    The old cascade in complete_task() compared each pending task's own id
+    against its prerequisites, so dependents were never promoted and could
+    be left pending with every prerequisite done. Runs before the switch to
+    status codes, so it binds the legacy status strings.
+    """
+    c.execute(f'''
+        UPDATE tasks SET status = ?
+        WHERE status = ?
+          AND id IN (SELECT task_id FROM task_prereqs)
+          AND NOT EXISTS ({_SQL_BLOCKING_PREREQS})
+    ''', ("eligible", "pending", "completed"))
+
+def _add_roi_column(c):
+    """Add the generated roi_score column to a legacy tasks table
+
+    SQLite only allows VIRTUAL generated columns in ALTER TABLE, so the
+    score is computed on read and materialized in idx_tasks_status_roi,
+    which is what the status + ROI lookups use. The plain status index
+    becomes redundant.
+    """
+    c.execute(f'ALTER TABLE tasks ADD COLUMN roi_score REAL GENERATED ALWAYS AS {_ROI_SQL} VIRTUAL')
+    c.execute('DROP INDEX IF EXISTS idx_tasks_status')
 
+def _backfill_fts(c):
+    """Index the tasks that existed before tasks_fts did"""
+    c.execute(_FTS_TABLE)
+    c.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+# Columns copied by _convert_status_codes(): every legacy tasks column but
+# status, or just those of the table the standalone task_tracker created
+_LEGACY_TASK_COLUMNS = ('id, title, description, priority, prerequisites, impact_score, '
+                        'urgency_score, effort_score, auto_complete, completion_criteria, '
+                        'created_at, updated_at, started_at, completed_at, created_by')
+_PLAIN_TASK_COLUMNS = 'id, title, description, priority, created_at, updated_at'
+
+def _convert_status_codes(c, columns=_LEGACY_TASK_COLUMNS):
+    """Rebuild tasks with TaskStatus codes in place of the status strings
+
+    A column's type cannot be altered in place, so the rows are copied into
+    a fresh table, which then takes the old one's name. AUTOINCREMENT's
+    high-water mark is carried over so deleted ids are never reused.
+    Columns left out of the copy take their defaults.
+    """
+    mapping = ' '.join(f"WHEN '{name}' THEN {code}" for code, name in enumerate(_STATUS_NAMES))
+    c.execute(_TASKS_TABLE.format(table='tasks_new'))
+    c.execute(f'''
+        INSERT INTO tasks_new (status, {columns})
+        SELECT CASE status {mapping} ELSE {TaskStatus.PENDING.value} END, {columns}
+        FROM tasks
+    ''')
+    seq = c.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+    c.execute('DROP TABLE tasks')
+    c.execute('ALTER TABLE tasks_new RENAME TO tasks')
+    if seq:
+        c.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tasks'", seq)
 
 # ── Goal management ──
 
 def add_goal(description, source="user"):
     """Add a high-level goal."""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute('''
-        INSERT INTO goals (description, status, source, tasks_generated, created_at, updated_at)
-        VALUES (?, 'active', ?, FALSE, ?, ?)
-    ''', (description, source, now, now))
-    goal_id = c.lastrowid
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute('''
+            INSERT INTO goals (description, status, source, tasks_generated, created_at, updated_at)
+            VALUES (?, 'active', ?, FALSE, ?, ?)
+        ''', (description, source, now, now))
+        goal_id = c.lastrowid
     print(f"Goal added: {description} (ID: {goal_id})")
     return goal_id
 
 
 def get_active_goals():
     """Get all active goals."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT id, description, status, source, tasks_generated, created_at, updated_at FROM goals WHERE status = 'active'")
-    goals = c.fetchall()
-    conn.close()
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, description, status, source, tasks_generated, created_at, updated_at FROM goals WHERE status = 'active'")
+        goals = c.fetchall()
     return goals
 
 
 def get_untasked_goals():
     """Get active goals that haven't been decomposed into tasks yet."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT id, description, status, source, tasks_generated, created_at, updated_at FROM goals WHERE status = 'active' AND tasks_generated = FALSE")
-    goals = c.fetchall()
-    conn.close()
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, description, status, source, tasks_generated, created_at, updated_at FROM goals WHERE status = 'active' AND tasks_generated = FALSE")
+        goals = c.fetchall()
     return goals
 
 
 def mark_goal_tasked(goal_id):
     """Mark a goal as having been decomposed into tasks."""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute("UPDATE goals SET tasks_generated = TRUE, updated_at = ? WHERE id = ?", (now, goal_id))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute(_SQL_MARK_GOAL_TASKED, (now, goal_id))
 
 
 def complete_goal(goal_id):
     """Mark a goal as completed."""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute("UPDATE goals SET status = 'completed', updated_at = ? WHERE id = ?", (now, goal_id))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute("UPDATE goals SET status = 'completed', updated_at = ? WHERE id = ?", (now, goal_id))
     print(f"Goal {goal_id} completed")
 
-def add_task(title, description="", priority="medium", 
-             prerequisites=None, impact=5, urgency=5, effort=5,
-             auto_complete=False, criteria=""):
-    """
-    Add a new task with full autonomy metadata
-    """
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    
+def _insert_task(c, title, description="", priority="medium",
+                 prerequisites=None, impact=5, urgency=5, effort=5,
+                 auto_complete=False, criteria="", now=None):
+    """Insert one task and its prerequisite edges on an open cursor"""
+    now = now or _now_iso()
     prereq_json = ",".join([str(p) for p in (prerequisites or [])])
+    # A task with no prerequisites is eligible straight away
+    status = TaskStatus.PENDING.value if prerequisites else TaskStatus.ELIGIBLE.value
     
     c.execute('''
         INSERT INTO tasks (
@@ -216,246 +545,222 @@ def add_task(title, description="", priority="medium",
             created_at, updated_at
         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', (
-        title, description, TaskStatus.PENDING.value, priority,
+        title, description, status, priority,
         prereq_json, impact, urgency, effort,
         auto_complete, criteria,
         now, now
     ))
     
     task_id = c.lastrowid
-    
-    # Check if prerequisites are met
-    if not prerequisites:
-        c.execute('UPDATE tasks SET status = ? WHERE id = ?', 
-                  (TaskStatus.ELIGIBLE.value, task_id))
-    
-    conn.commit()
-    conn.close()
+    c.executemany(_SQL_ADD_PREREQ, [(task_id, p) for p in (prerequisites or [])])
+    return task_id
+
+def add_task(title, description="", priority="medium", 
+             prerequisites=None, impact=5, urgency=5, effort=5,
+             auto_complete=False, criteria=""):
+    """
+    Add a new task with full autonomy metadata
+    """
+    with write_transaction() as conn:
+        task_id = _insert_task(conn.cursor(), title, description, priority,
+                               prerequisites, impact, urgency, effort,
+                               auto_complete, criteria)
     
     print(f"✓ Task created: {title} (ID: {task_id})")
     return task_id
 
-def list_tasks(status=None, sort_by="roi"):
+def add_tasks_bulk(specs, goal_id=None):
     """
-    List tasks with ROI-based sorting
-    ROI = impact × urgency ÷ effort
+    Add several tasks in one transaction (one commit for the whole batch)
+    Each spec is a dict of add_task() keyword arguments. When goal_id is
+    given, the goal is marked as tasked in the same transaction, so a
+    decomposed goal is never left half-populated.
+    Returns the new task IDs in spec order; they share one timestamp.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    
-    if status:
-        c.execute('SELECT * FROM tasks WHERE status = ? ORDER BY created_at DESC', (status,))
-    else:
-        c.execute('SELECT * FROM tasks ORDER BY created_at DESC')
+    now = _now_iso()
+    with write_transaction() as conn:
+        c = conn.cursor()
+        task_ids = [_insert_task(c, **spec, now=now) for spec in specs]
+        if goal_id is not None:
+            c.execute(_SQL_MARK_GOAL_TASKED, (now, goal_id))
     
-    tasks = c.fetchall()
-    conn.close()
+    print(f"✓ Created {len(task_ids)} tasks")
+    return task_ids
+
+def list_tasks(status=None, sort_by="roi", limit=None):
+    """
+    List tasks with ROI-based sorting, printing rows as SQLite returns them
+    ROI = impact × urgency ÷ effort (computed by SQLite)
+    status may be a TaskStatus or its name, e.g. "eligible".
+    Returns the number of tasks listed.
+    """
+    if isinstance(status, str):
+        status = status_code(status)
+    where = 'WHERE status = ?' if status is not None else ''
+    order = 'roi_score DESC, created_at DESC' if sort_by == "roi" else 'created_at DESC'
+    params = (int(status),) if status is not None else ()
+    count = 0
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute(f'''
+            SELECT id, title, status, priority, roi_score
+            FROM tasks {where}
+            ORDER BY {order}
+            LIMIT ?
+        ''', params + (limit if limit is not None else -1,))
+        for task_id, title, task_status, priority, roi in c:
+            if not count:
+                print(f"\n{'ID':<4} {'Status':<10} {'Priority':<8} {'ROI':<6} {'Title':<35}")
+                print("-" * 70)
+            emoji = _STATUS_EMOJI[task_status] if _known_status(task_status) else "  "
+            print(f"{task_id:<4} {emoji} {status_name(task_status):<9} {priority:<8} {roi:<6.1f} {title[:33]:<35}")
+            count += 1
     
-    if not tasks:
+    if not count:
         print("No tasks found.")
-        return []
-    
-    # Calculate ROI for sorting
-    task_list = []
-    for task in tasks:
-        t = {
-            'id': task[0],
-            'title': task[1],
-            'status': task[3],
-            'priority': task[4],
-            'prerequisites': task[5],
-            'impact': task[6],
-            'urgency': task[7],
-            'effort': task[8],
-        }
-        
-        # ROI = impact × urgency ÷ effort
-        t['roi_score'] = (t['impact'] * t['urgency']) / max(t['effort'], 1)
-        task_list.append(t)
-    
-    # Sort by ROI (highest first)
-    if sort_by == "roi":
-        task_list.sort(key=lambda x: x['roi_score'], reverse=True)
-    
-    print(f"\n{'ID':<4} {'Status':<10} {'Priority':<8} {'ROI':<6} {'Title':<35}")
-    print("-" * 70)
-    for t in task_list:
-        status_emoji = {"pending": "⏳", "eligible": "✅", "in_progress": "🔄", "review": "👀", "completed": "✓"}
-        emoji = status_emoji.get(t['status'], "  ")
-        print(f"{t['id']:<4} {emoji} {t['status']:<9} {t['priority']:<8} {t['roi_score']:<6.1f} {t['title'][:33]:<35}")
-    
-    return task_list
+    return count
 
 def get_eligible_tasks():
-    """Get tasks ready to work on (dependencies met)"""
-    conn = get_connection()
-    c = conn.cursor()
-    
-    c.execute('SELECT * FROM tasks WHERE status = ? ORDER BY (impact_score * urgency_score / effort_score) DESC', 
-              (TaskStatus.ELIGIBLE.value,))
-    
-    tasks = c.fetchall()
-    conn.close()
+    """Get tasks ready to work on (dependencies met), best ROI first"""
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute('SELECT * FROM tasks WHERE status = ? ORDER BY roi_score DESC',
+                  (TaskStatus.ELIGIBLE.value,))
+        tasks = c.fetchall()
     return tasks
 
 def check_prerequisites(task_id):
-    """Check if all prerequisites are completed"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT prerequisites FROM tasks WHERE id = ?', (task_id,))
-    row = c.fetchone()
-    conn.close()
-    
-    if not row or not row[0]:
-        return True, []
-    
-    prereq_ids = [int(x) for x in row[0].split(',') if x.strip()]
-    
-    conn = get_connection()
-    c = conn.cursor()
-    pending = []
-    for pid in prereq_ids:
-        c.execute('SELECT status FROM tasks WHERE id = ?', (pid,))
-        status = c.fetchone()
-        if not status or status[0] != TaskStatus.DONE.value:
-            pending.append(pid)
-    
-    conn.close()
+    """Check if all prerequisites are completed; returns (ready, pending ids)"""
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute(_SQL_PENDING_PREREQS, (task_id, TaskStatus.DONE.value))
+        pending = [row[0] for row in c]
     return len(pending) == 0, pending
 
 def start_task(task_id):
-    """Start a task if eligible"""
-    eligible, pending = check_prerequisites(task_id)
+    """Start a task if eligible
+
+    The prerequisite check is part of the UPDATE itself, so it cannot go
+    stale between checking and starting; the blocking prerequisites are
+    only looked up when the task was not started.
+    """
+    with get_writer() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute(f'''
+            UPDATE tasks SET status = ?, started_at = ?, updated_at = ?
+            WHERE id = ? AND NOT EXISTS ({_SQL_BLOCKING_PREREQS})
+        ''', (TaskStatus.IN_PROGRESS.value, now, now, task_id, TaskStatus.DONE.value))
+        started = c.rowcount > 0
+        if not started:
+            c.execute(_SQL_PENDING_PREREQS, (task_id, TaskStatus.DONE.value))
+            pending = [row[0] for row in c]
     
-    if not eligible:
-        print(f"❌ Task {task_id} blocked by: {pending}")
+    if not started:
+        if pending:
+            print(f"❌ Task {task_id} blocked by: {pending}")
+        else:
+            print(f"Task {task_id} not found")
         return False
     
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute('''
-        UPDATE tasks SET status = ?, started_at = ?, updated_at = ?
-        WHERE id = ?
-    ''', (TaskStatus.IN_PROGRESS.value, now, now, task_id))
-    conn.commit()
-    conn.close()
-    
     print(f"🔄 Started task {task_id}")
     return True
 
 def complete_task(task_id, criteria_met=True):
-    """Mark task as done"""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute('''
-        UPDATE tasks SET status = ?, completed_at = ?, updated_at = ?
-        WHERE id = ?
-    ''', (TaskStatus.DONE.value, now, now, task_id))
-    conn.commit()
-    
-    # Check other tasks - some may now be eligible
-    c.execute('SELECT id, prerequisites FROM tasks WHERE status = ?', (TaskStatus.PENDING.value,))
-    pending_tasks = c.fetchall()
-    conn.close()
+    """Mark task as done and promote any dependents it unblocked"""
+    with write_transaction() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute('''
+            UPDATE tasks SET status = ?, completed_at = ?, updated_at = ?
+            WHERE id = ?
+        ''', (TaskStatus.DONE.value, now, now, task_id))
     
-    for task_id, prereqs in pending_tasks:
-        if prereqs:
-            prereq_list = [int(x) for x in prereqs.split(',') if x.strip()]
-            if task_id in prereq_list:
-                eligible, _ = check_prerequisites(task_id)
-                if eligible:
-                    mark_eligible(task_id)
+        # Pending dependents of this task become eligible once every
+        # prerequisite is completed
+        c.execute(f'''
+            UPDATE tasks SET status = ?
+            WHERE status = ?
+              AND id IN (SELECT task_id FROM task_prereqs WHERE prereq_id = ?)
+              AND NOT EXISTS ({_SQL_BLOCKING_PREREQS})
+            RETURNING id
+        ''', (TaskStatus.ELIGIBLE.value, TaskStatus.PENDING.value, task_id, TaskStatus.DONE.value))
+        promoted = [row[0] for row in c.fetchall()]
     
+    for eligible_id in promoted:
+        print(f"✅ Task {eligible_id} is now eligible")
     print(f"✓ Completed task {task_id}")
 
 def mark_eligible(task_id):
     """Mark a task as eligible for work"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('UPDATE tasks SET status = ? WHERE id = ?', 
-              (TaskStatus.ELIGIBLE.value, task_id))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        c.execute(_SQL_SET_STATUS, (TaskStatus.ELIGIBLE.value, task_id))
     print(f"✅ Task {task_id} is now eligible")
 
 def mark_review(task_id):
     """Mark a task as in review (awaiting approval)"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('UPDATE tasks SET status = ? WHERE id = ?', 
-              (TaskStatus.REVIEW.value, task_id))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        c.execute(_SQL_SET_STATUS, (TaskStatus.REVIEW.value, task_id))
     print(f"👀 Task {task_id} is now in review")
 
 def mark_eligible_if_ready(task_id):
     """Mark task eligible if prerequisites are met, otherwise pending."""
-    eligible, _ = check_prerequisites(task_id)
-    conn = get_connection()
-    c = conn.cursor()
-    next_status = TaskStatus.ELIGIBLE.value if eligible else TaskStatus.PENDING.value
-    c.execute('UPDATE tasks SET status = ? WHERE id = ?', (next_status, task_id))
-    conn.commit()
-    conn.close()
-    if eligible:
+    with get_writer() as conn:
+        c = conn.cursor()
+        c.execute(f'''
+            UPDATE tasks
+            SET status = CASE WHEN EXISTS ({_SQL_BLOCKING_PREREQS}) THEN ? ELSE ? END
+            WHERE id = ?
+            RETURNING status
+        ''', (TaskStatus.DONE.value, TaskStatus.PENDING.value, TaskStatus.ELIGIBLE.value, task_id))
+        rows = c.fetchall()
+    if rows and rows[0][0] == TaskStatus.ELIGIBLE.value:
         print(f"✅ Task {task_id} is now eligible")
     else:
         print(f"⏳ Task {task_id} is now pending prerequisites")
 
 def log_decision(task_id, decision, reasoning, outcome=""):
     """Log a decision for learning"""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute('''
-        INSERT INTO decision_log (task_id, decision, reasoning, outcome, created_at)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (task_id, decision, reasoning, outcome, now))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute('''
+            INSERT INTO decision_log (task_id, decision, reasoning, outcome, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (task_id, decision, reasoning, outcome, now))
 
 def log_event(event_type, payload):
     """Log an event from webhooks"""
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute('''
-        INSERT INTO event_log (event_type, payload, created_at)
-        VALUES (?, ?, ?)
-    ''', (event_type, payload, now))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute('''
+            INSERT INTO event_log (event_type, payload, created_at)
+            VALUES (?, ?, ?)
+        ''', (event_type, payload, now))
 
 # ── Approval tracking ──
 
 def create_approval_request(task_id, session_key=None):
-    conn = get_connection()
-    c = conn.cursor()
-    now_iso = datetime.now().isoformat()
-    now_ms = int(time.time() * 1000)
-    c.execute('''
-        INSERT INTO approvals (
-            task_id, status, session_key, requested_at_ms,
-            created_at, updated_at
-        ) VALUES (?, 'pending', ?, ?, ?, ?)
-    ''', (task_id, session_key, now_ms, now_iso, now_iso))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now_iso = _now_iso()
+        now_ms = int(time.time() * 1000)
+        c.execute(_SQL_INSERT_APPROVAL, (task_id, session_key, now_ms, now_iso, now_iso))
 
 def get_approval(task_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('''
-        SELECT task_id, status, session_key, requested_at_ms, decided_at_ms, decision_text
-        FROM approvals
-        WHERE task_id = ?
-        ORDER BY id DESC
-        LIMIT 1
-    ''', (task_id,))
-    row = c.fetchone()
-    conn.close()
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT task_id, status, session_key, requested_at_ms, decided_at_ms, decision_text
+            FROM approvals
+            WHERE task_id = ?
+            ORDER BY id DESC
+            LIMIT 1
+        ''', (task_id,))
+        row = c.fetchone()
     if not row:
         return None
     return {
@@ -468,116 +773,120 @@ def get_approval(task_id):
     }
 
 def get_pending_approvals():
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('''
-        SELECT task_id, session_key, requested_at_ms
-        FROM approvals
-        WHERE status = 'pending'
-        ORDER BY requested_at_ms ASC
-    ''')
-    rows = c.fetchall()
-    conn.close()
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT task_id, session_key, requested_at_ms
+            FROM approvals
+            WHERE status = 'pending'
+            ORDER BY requested_at_ms ASC
+        ''')
+        rows = c.fetchall()
     return [
         {"task_id": r[0], "session_key": r[1], "requested_at_ms": r[2] or 0}
         for r in rows
     ]
 
 def resolve_approval(task_id, status, decision_text=""):
-    conn = get_connection()
-    c = conn.cursor()
-    now_iso = datetime.now().isoformat()
-    now_ms = int(time.time() * 1000)
-    c.execute('''
-        UPDATE approvals
-        SET status = ?, decided_at_ms = ?, decision_text = ?, updated_at = ?
-        WHERE task_id = ? AND status = 'pending'
-    ''', (status, now_ms, decision_text[:500], now_iso, task_id))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now_iso = _now_iso()
+        now_ms = int(time.time() * 1000)
+        c.execute(_SQL_RESOLVE_APPROVAL, (status, now_ms, decision_text[:500], now_iso, task_id))
 
 def get_inbound_last_ts(session_key):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT last_ts FROM inbound_state WHERE session_key = ?', (session_key,))
-    row = c.fetchone()
-    conn.close()
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute('SELECT last_ts FROM inbound_state WHERE session_key = ?', (session_key,))
+        row = c.fetchone()
     if not row:
         return 0
     return int(row[0] or 0)
 
 def set_inbound_last_ts(session_key, last_ts):
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute('''
-        INSERT INTO inbound_state (session_key, last_ts, updated_at)
-        VALUES (?, ?, ?)
-        ON CONFLICT(session_key) DO UPDATE SET
-            last_ts = excluded.last_ts,
-            updated_at = excluded.updated_at
-    ''', (session_key, int(last_ts), now))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute(_SQL_UPSERT_INBOUND, (session_key, int(last_ts), now))
 
 def get_approval_state(session_key):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT last_batch_sent_ms FROM approval_state WHERE session_key = ?', (session_key,))
-    row = c.fetchone()
-    conn.close()
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute('SELECT last_batch_sent_ms FROM approval_state WHERE session_key = ?', (session_key,))
+        row = c.fetchone()
     if not row:
         return 0
     return int(row[0] or 0)
 
 def set_approval_state(session_key, last_batch_sent_ms):
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute('''
-        INSERT INTO approval_state (session_key, last_batch_sent_ms, updated_at)
-        VALUES (?, ?, ?)
-        ON CONFLICT(session_key) DO UPDATE SET
-            last_batch_sent_ms = excluded.last_batch_sent_ms,
-            updated_at = excluded.updated_at
-    ''', (session_key, int(last_batch_sent_ms), now))
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        c = conn.cursor()
+        now = _now_iso()
+        c.execute(_SQL_UPSERT_APPROVAL_STATE, (session_key, int(last_batch_sent_ms), now))
+
+def process_inbound_batch(session_key, events):
+    """
+    Apply one tick of inbound events for a session in a single transaction
+    Each event is a dict. Events with "type": "approval_request" (task_id)
+    or "approval_decision" (task_id, status, optional text) create or
+    resolve approvals; events without a type are plain messages. The
+    session's inbound last_ts advances to the largest "ts" in the batch.
+    An unknown type raises ValueError and nothing in the batch is applied.
+    """
+    now_iso = _now_iso()
+    now_ms = int(time.time() * 1000)
+    last_ts = None
+    with write_transaction() as conn:
+        c = conn.cursor()
+        for event in events:
+            kind = event.get("type")
+            if kind == "approval_request":
+                c.execute(_SQL_INSERT_APPROVAL, (event["task_id"], session_key, now_ms, now_iso, now_iso))
+            elif kind == "approval_decision":
+                c.execute(_SQL_RESOLVE_APPROVAL, (event["status"], now_ms, event.get("text", "")[:500],
+                                                  now_iso, event["task_id"]))
+            elif kind is not None:
+                raise ValueError(f"Unknown inbound event type: {kind}")
+            if event.get("ts"):
+                last_ts = max(last_ts or 0, int(event["ts"]))
+        if last_ts is not None:
+            c.execute(_SQL_UPSERT_INBOUND, (session_key, last_ts, now_iso))
 
 def get_next_best_task():
     """Decision engine: Pick highest ROI eligible task"""
-    tasks = get_eligible_tasks()
-    if not tasks:
-        return None
-    
-    best = None
-    best_roi = 0
-    
-    for task in tasks:
-        roi = (task[6] * task[7]) / max(task[8], 1)  # impact × urgency ÷ effort
-        if roi > best_roi:
-            best_roi = roi
-            best = task
-    
-    return best
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute('SELECT * FROM tasks WHERE status = ? ORDER BY roi_score DESC LIMIT 1',
+                  (TaskStatus.ELIGIBLE.value,))
+        return c.fetchone()
+
+def search_tasks(query, limit=20):
+    """Full-text search over task titles and descriptions (FTS5 MATCH syntax), best match first"""
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT rowid, title FROM tasks_fts
+            WHERE tasks_fts MATCH ?
+            ORDER BY rank LIMIT ?
+        ''', (query, limit))
+        return c.fetchall()
 
 def show_task(task_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-    task = c.fetchone()
-    conn.close()
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute(_SQL_GET_TASK, (task_id,))
+        task = c.fetchone()
     
     if task:
         print(f"\n{'='*50}")
         print(f"Task #{task[0]}")
         print(f"Title: {task[1]}")
         print(f"Description: {task[2] or '(none)'}")
-        print(f"Status: {task[3]}")
+        print(f"Status: {status_name(task[3])}")
         print(f"Priority: {task[4]}")
         print(f"\nROI Metrics:")
         print(f"  Impact: {task[6]}/10  Urgency: {task[7]}/10  Effort: {task[8]}/10")
-        print(f"  ROI Score: {(task[6] * task[7]) / max(task[8], 1):.1f}")
+        print(f"  ROI Score: {task[16]:.1f}")
         print(f"\nDependencies:")
         print(f"  Prerequisites: {task[5] or 'None'}")
         print(f"\nTimestamps:")
@@ -589,13 +898,42 @@ def show_task(task_id):
         print(f"Task {task_id} not found.")
 
 def get_task(task_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-    row = c.fetchone()
-    conn.close()
+    with get_reader() as conn:
+        c = conn.cursor()
+        c.execute(_SQL_GET_TASK, (task_id,))
+        row = c.fetchone()
     return row
 
+def _parse_id_list(value):
+    return [int(x) for x in value.split(',') if x.strip()]
+
+def _build_parser():
+    parser = argparse.ArgumentParser(prog='autonomous_tracker.py',
+                                     epilog="Run 'help' for the command summary")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    
+    add = sub.add_parser('add', help='add a task')
+    add.add_argument('title', nargs='?', default='')
+    add.add_argument('description', nargs='*')
+    add.add_argument('--priority', type=str.lower, default='medium')
+    add.add_argument('--impact', type=int, default=5)
+    add.add_argument('--urgency', type=int, default=5)
+    add.add_argument('--effort', type=int, default=5)
+    add.add_argument('--prereq', type=_parse_id_list, default=[])
+    add.add_argument('--auto', action='store_true')
+    add.add_argument('--criteria', default='')
+    
+    sub.add_parser('list', help='list tasks').add_argument('status', nargs='?')
+    sub.add_parser('next', help='show the best next task')
+    for name in ('start', 'done', 'show'):
+        sub.add_parser(name, help=f'{name} a task').add_argument('task_id', type=int)
+    sub.add_parser('decisions', help='show recent decisions').add_argument('task_id', nargs='?', type=int)
+    sub.add_parser('events', help='show recent events')
+    sub.add_parser('search', help='search task titles and descriptions').add_argument('words', nargs='+')
+    sub.add_parser('add-goal', help='add a goal').add_argument('description', nargs='+')
+    sub.add_parser('goals', help='list active goals')
+    return parser
+
 def main():
     init_db()
     
@@ -624,113 +962,85 @@ def main():
 ║    show <id>                                              ║
 ║    decisions [task_id]                                    ║
 ║    events                                                 ║
+║    search <words>                                         ║
 ║    help                                                   ║
 ║                                                              ║
 ╚══════════════════════════════════════════════════════════════╝
         """)
         return
     
-    cmd = args[0]
+    parser = _build_parser()
+    ns, extra = parser.parse_known_args(args)
+    cmd = ns.cmd
+    if extra:
+        # Words after a flag still belong to an add's description
+        if cmd != 'add':
+            parser.error(f"unrecognized arguments: {' '.join(extra)}")
+        ns.description += extra
     
     if cmd == 'add':
-        title = args[1] if len(args) > 1 else ""
-        description = ""
-        priority = "medium"
-        impact, urgency, effort = 5, 5, 5
-        prereqs = []
-        auto_complete = False
-        criteria = ""
-        
-        i = 2
-        while i < len(args):
-            arg = args[i]
-            if arg == '--priority' and i + 1 < len(args):
-                priority = args[i + 1].lower()
-                i += 2
-            elif arg == '--impact' and i + 1 < len(args):
-                impact = int(args[i + 1])
-                i += 2
-            elif arg == '--urgency' and i + 1 < len(args):
-                urgency = int(args[i + 1])
-                i += 2
-            elif arg == '--effort' and i + 1 < len(args):
-                effort = int(args[i + 1])
-                i += 2
-            elif arg == '--prereq' and i + 1 < len(args):
-                prereqs = [int(x) for x in args[i + 1].split(',')]
-                i += 2
-            elif arg == '--auto':
-                auto_complete = True
-                i += 1
-            elif arg == '--criteria' and i + 1 < len(args):
-                criteria = args[i + 1]
-                i += 2
-            else:
-                description += " " + args[i] if description else args[i]
-                i += 1
-        
-        add_task(title, description, priority, prereqs, impact, urgency, effort, auto_complete, criteria)
+        add_task(ns.title, " ".join(ns.description), ns.priority, ns.prereq,
+                 ns.impact, ns.urgency, ns.effort, ns.auto, ns.criteria)
     
     elif cmd == 'list':
-        status = args[1] if len(args) > 1 else None
-        if status and status not in ['pending', 'eligible', 'in_progress', 'review', 'completed']:
+        status = ns.status
+        if status not in _STATUS_NAMES:
             status = None
-        list_tasks(status if status else None)
+        list_tasks(status)
     
     elif cmd == 'next':
         task = get_next_best_task()
         if task:
             print(f"\n🎯 Best next task: #{task[0]} - {task[1]}")
-            print(f"   ROI: {(task[6] * task[7]) / max(task[8], 1):.1f}")
+            print(f"   ROI: {task[16]:.1f}")
         else:
             print("No eligible tasks. Check pending tasks with dependencies.")
     
     elif cmd == 'start':
-        if len(args) < 2:
-            print("Error: 'start' requires task ID")
-            return
-        start_task(int(args[1]))
+        start_task(ns.task_id)
     
     elif cmd == 'done':
-        if len(args) < 2:
-            print("Error: 'done' requires task ID")
-            return
-        complete_task(int(args[1]))
+        complete_task(ns.task_id)
     
     elif cmd == 'show':
-        if len(args) < 2:
-            print("Error: 'show' requires task ID")
-            return
-        show_task(int(args[1]))
+        show_task(ns.task_id)
     
     elif cmd == 'decisions':
         # Show recent decisions
-        conn = get_connection()
-        c = conn.cursor()
-        if len(args) > 1:
-            c.execute('SELECT * FROM decision_log WHERE task_id = ? ORDER BY created_at DESC', (args[1],))
-        else:
-            c.execute("SELECT * FROM decision_log ORDER BY created_at DESC LIMIT 20")
-        decisions = c.fetchall()
-        conn.close()
-        for d in decisions:
-            print(f"  Task {d[1]}: {d[2]} ({d[4] or 'pending'})")
+        where = 'WHERE task_id = ?' if ns.task_id else ''
+        params = (ns.task_id,) if ns.task_id else ()
+        with get_reader() as conn:
+            c = conn.cursor()
+            c.execute(f'''
+                SELECT task_id, decision, COALESCE(NULLIF(outcome, ''), 'pending')
+                FROM decision_log {where}
+                ORDER BY id DESC LIMIT 20
+            ''', params)
+            for task_id, decision, outcome in c:
+                print(f"  Task {task_id}: {decision} ({outcome})")
     
     elif cmd == 'events':
-        conn = get_connection()
-        c = conn.cursor()
-        c.execute('SELECT * FROM event_log ORDER BY created_at DESC LIMIT 10')
-        events = c.fetchall()
-        conn.close()
-        for e in events:
-            print(f"  {e[3]}: {e[1]} - {e[2][:50]}")
+        with get_reader() as conn:
+            c = conn.cursor()
+            c.execute('''
+                SELECT created_at, event_type, COALESCE(substr(payload, 1, 50), '')
+                FROM event_log
+                ORDER BY id DESC LIMIT 10
+            ''')
+            for created_at, event_type, payload in c:
+                print(f"  {created_at}: {event_type} - {payload}")
+    
+    elif cmd == 'search':
+        # Quote each word so punctuation is matched literally, not parsed as FTS syntax
+        query = " ".join('"' + w.replace('"', '""') + '"' for w in ns.words)
+        results = search_tasks(query)
+        if not results:
+            print("No matching tasks.")
+        for task_id, title in results:
+            print(f"  #{task_id}: {title}")
     
     elif cmd == 'add-goal':
-        if len(args) < 2:
-            print("Error: 'add-goal' requires a description")
-            return
-        desc = " ".join(args[1:])
-        add_goal(desc)
+        add_goal(" ".join(ns.description))
 
     elif cmd == 'goals':
         goals = get_active_goals()
@@ -743,9 +1053,5 @@ def main():
                 tasked = "Yes" if g[4] else "No"
                 print(f"{g[0]:<4} {tasked:<7} {g[3]:<8} {g[1][:48]:<50}")
 
-    else:
-        print(f"Unknown command: {cmd}")
-        print("Run 'help' for commands")
-
 if __name__ == '__main__':
     main()
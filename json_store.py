@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+JSON file helpers shared by the scrapers and the prospect tracker
+
+Encodes with orjson when it is installed, and writes files atomically.
+"""
+
+import json
+import os
+
+try:
+    import orjson  # Optional: faster JSON encode/decode
+except ImportError:
+    orjson = None
+
+def dumps(data, pretty=False):
+    """Serialize to JSON bytes, with orjson when it is installed"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def loads(raw):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def file_mtime(path):
+    """Modification time of path in nanoseconds, or None if it does not exist"""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def write_bytes(path, raw):
+    """Write bytes to a temp file and rename it over path, so a crash never leaves half a file"""
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, path)
+
+def write_json(path, data):
+    """Serialize data compactly and write it atomically to path"""
+    write_bytes(path, dumps(data))
+
+class CachedLoader:
+    """Result of load(), reused until the mtime of any of paths changes"""
+
+    def __init__(self, paths, load):
+        self.paths = paths
+        self._load = load
+        self.data = None
+        self._mtimes = None
+
+    def _current(self):
+        return tuple(file_mtime(path) for path in self.paths)
+
+    def get(self):
+        # Stat before reading, so a write that lands mid-read forces a reload
+        mtimes = self._current()
+        if self.data is None or self._mtimes != mtimes:
+            self.data = self._load()
+            self._mtimes = mtimes
+        return self.data
+
+    def store(self, data):
+        """Keep data as the files' contents after writing them"""
+        self.data = data
+        self._mtimes = self._current()
+
+    def invalidate(self):
+        """Drop the cached data so the next get() reloads"""
+        self.data = None
+        self._mtimes = None
@@ -8,48 +8,91 @@ Usage:
     python3 prospect_tracker.py add "Name" "role" "company" "email" "source" "notes"
     python3 prospect_tracker.py status            # Show prospect stats
     python3 prospect_tracker.py export            # Export for Sheets import
+    python3 prospect_tracker.py export-json       # Write prospects.json from the database
+    python3 prospect_tracker.py import batch.json # Bulk-import prospects from JSON
 """
 
-import json
-import csv
-import subprocess
+import sqlite3
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import quote_plus
+
+from json_store import dumps, loads, write_bytes
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
-PROSPECTS_FILE = SCRIPT_DIR / "prospects.json"
+DB_PATH = SCRIPT_DIR / "prospects.db"
+PROSPECTS_FILE = SCRIPT_DIR / "prospects.json"  # Legacy store, imported once; kept as an export
 EXPORT_DIR = SCRIPT_DIR / "exports"
 
-def load_prospects():
-    """Load existing prospects from JSON"""
-    if PROSPECTS_FILE.exists():
-        with open(PROSPECTS_FILE, 'r') as f:
-            return json.load(f)
-    return {
-        "last_updated": None,
-        "prospects": [],
-        "stats": {
-            "total": 0,
-            "contacted": 0,
-            "replied": 0,
-            "meetings": 0
-        }
-    }
+_STATUS_EMOJI = {"new": "🆕", "contacted": "📧", "replied": "✅", "meeting": "📅", "won": "🎉", "lost": "❌"}
 
-def save_prospects(data):
-    """Save prospects to JSON"""
-    data["last_updated"] = datetime.now().isoformat()
-    with open(PROSPECTS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+def get_connection():
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
 
-def add_prospect(name, role, company, email, source, notes="", priority="medium"):
-    """Add a new prospect"""
-    data = load_prospects()
-    
-    prospect = {
-        "id": len(data["prospects"]) + 1,
+def init_db():
+    """Create the prospects table, importing prospects.json on first run"""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS prospects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            role TEXT,
+            company TEXT,
+            email TEXT,
+            source TEXT,
+            notes TEXT,
+            priority TEXT DEFAULT 'medium',
+            status TEXT DEFAULT 'new',  -- new, contacted, replied, meeting, won, lost
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_status ON prospects(status)')
+    c.execute('''
+        CREATE VIEW IF NOT EXISTS stats AS
+        SELECT COUNT(*) AS total,
+               COALESCE(SUM(status = 'contacted'), 0) AS contacted,
+               COALESCE(SUM(status = 'replied'), 0) AS replied,
+               COALESCE(SUM(status = 'meeting'), 0) AS meetings,
+               MAX(updated_at) AS last_updated
+        FROM prospects
+    ''')
+    if c.execute('PRAGMA user_version').fetchone()[0] == 0:
+        _import_legacy_json(c)
+        c.execute('PRAGMA user_version = 1')
+    conn.commit()
+    conn.close()
+
+_IMPORT_SQL = '''
+    INSERT OR IGNORE INTO prospects (id, name, role, company, email, source, notes,
+                                     priority, status, created_at, updated_at)
+    VALUES (:id, :name, :role, :company, :email, :source, :notes,
+            :priority, :status, :created_at, :updated_at)
+'''
+
+def _import_legacy_json(c):
+    """Copy prospects from the old prospects.json store, keeping their ids"""
+    if not PROSPECTS_FILE.exists():
+        return
+    data = loads(PROSPECTS_FILE.read_bytes())
+    c.executemany(_IMPORT_SQL, data.get("prospects", []))
+
+_INSERT_SQL = '''
+    INSERT INTO prospects (name, role, company, email, source, notes,
+                           priority, status, created_at, updated_at)
+    VALUES (:name, :role, :company, :email, :source, :notes,
+            :priority, :status, :created_at, :updated_at)
+'''
+
+def _new_prospect(name, role, company, email="", source="", notes="", priority="medium", now=None):
+    """Build the row for a new prospect"""
+    if now is None:
+        now = datetime.now().isoformat()
+    return {
         "name": name,
         "role": role,
         "company": company,
@@ -57,121 +100,247 @@ def add_prospect(name, role, company, email, source, notes="", priority="medium"
         "source": source,
         "notes": notes,
         "priority": priority,
-        "status": "new",  # new, contacted, replied, meeting, won, lost
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat()
+        "status": "new",
+        "created_at": now,
+        "updated_at": now
     }
-    
-    data["prospects"].append(prospect)
-    data["stats"]["total"] = len(data["prospects"])
-    save_prospects(data)
+
+_INSERT_ROW_SQL = '''
+    INSERT INTO prospects (name, role, company, email, source, notes,
+                           priority, status, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 'new', ?, ?)
+'''
+
+def add_prospect_fast(name, role, company, email, source, notes="", priority="medium", now=None):
+    """Insert one prospect and return its id, without building a record dict"""
+    if now is None:
+        now = datetime.now().isoformat()
+    conn = get_connection()
+    c = conn.execute(_INSERT_ROW_SQL, (name, role, company, email or "N/A", source,
+                                       notes, priority, now, now))
+    conn.commit()
+    conn.close()
+    return c.lastrowid
+
+def add_prospect(name, role, company, email, source, notes="", priority="medium"):
+    """Add a new prospect, returning it as a dict"""
+    prospect = _new_prospect(name, role, company, email, source, notes, priority)
+    prospect["id"] = add_prospect_fast(name, role, company, email, source, notes, priority,
+                                       prospect["created_at"])
     
     print(f"  ✅ Added: {name} ({role} at {company})")
     return prospect
 
+def add_prospects_bulk(rows):
+    """Add many prospects in a single transaction
+
+    Each row is a dict of add_prospect() arguments; email, source, notes
+    and priority may be left out. The batch shares one timestamp.
+    Returns the number of prospects added.
+    """
+    now = datetime.now().isoformat()
+    prospects = [_new_prospect(**row, now=now) for row in rows]
+    
+    conn = get_connection()
+    conn.executemany(_INSERT_SQL, prospects)
+    conn.commit()
+    conn.close()
+    
+    print(f"  ✅ Added {len(prospects)} prospects")
+    return len(prospects)
+
+def import_json(path):
+    """Bulk-import prospects from a JSON file
+
+    The file holds a list of prospect dicts (add_prospect() arguments) or
+    a prospects.json-style document such as export_json() writes. A
+    record's id, status and timestamps are kept when present, and records
+    whose id is already in the database are skipped, so re-importing an
+    export adds nothing. A missing role or company is left blank, and
+    records without a name are skipped. Rows are inserted into an in-memory copy of the
+    database, which is then backed up over prospects.db in one pass;
+    writes made by other processes meanwhile would be lost.
+    Returns the number of prospects imported.
+    """
+    data = loads(Path(path).read_bytes())
+    records = data.get("prospects", []) if isinstance(data, dict) else data
+    fields = ("name", "role", "company", "email", "source", "notes", "priority")
+    kept = ("status", "created_at", "updated_at")
+    now = datetime.now().isoformat()
+    prospects = []
+    unnamed = 0
+    for r in records:
+        if not r.get("name"):
+            unnamed += 1
+            continue
+        row = _new_prospect(**{"role": "", "company": "", **{k: r[k] for k in fields if k in r}}, now=now)
+        row.update({k: r[k] for k in kept if r.get(k)})
+        row["id"] = r.get("id")  # None lets SQLite assign one
+        prospects.append(row)
+    
+    disk = get_connection()
+    mem = sqlite3.connect(":memory:")
+    disk.backup(mem)
+    before = mem.total_changes
+    mem.executemany(_IMPORT_SQL, prospects)
+    imported = mem.total_changes - before
+    mem.commit()
+    mem.backup(disk)
+    mem.close()
+    disk.close()
+    
+    skipped = len(prospects) - imported
+    print(f"  ✅ Imported {imported} prospects from {path}" + (f" ({skipped} already present)" if skipped else ""))
+    if unnamed:
+        print(f"  ⚠️  Skipped {unnamed} records without a name")
+    return imported
+
 def update_status(prospect_id, new_status):
     """Update prospect status"""
-    data = load_prospects()
-    for p in data["prospects"]:
-        if p["id"] == prospect_id:
-            p["status"] = new_status
-            p["updated_at"] = datetime.now().isoformat()
-            save_prospects(data)
-            print(f"  ✅ Updated {p['name']} → {new_status}")
-            return
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('UPDATE prospects SET status = ?, updated_at = ? WHERE id = ? RETURNING name',
+              (new_status, datetime.now().isoformat(), prospect_id))
+    row = c.fetchone()
+    conn.commit()
+    conn.close()
     
-    print(f"  ❌ Prospect {prospect_id} not found")
+    if row:
+        print(f"  ✅ Updated {row[0]} → {new_status}")
+    else:
+        print(f"  ❌ Prospect {prospect_id} not found")
+
+def _tsv_rows(cursor):
+    """Yield prospect rows for the TSV, trimming notes and the created date"""
+    for *fields, notes, created_at in cursor:
+        yield (*fields, notes[:200] if notes else "", created_at[:10] if created_at else "")
 
 def generate_tsv():
-    """Generate TSV for Google Sheets import"""
-    data = load_prospects()
+    """Generate TSV for Google Sheets import, streaming rows from the database"""
+    import csv
     
     EXPORT_DIR.mkdir(parents=True, exist_ok=True)
     filepath = EXPORT_DIR / "prospects_outreach.tsv"
     
     headers = ["ID", "Name", "Role", "Company", "Email", "Source", "Priority", "Status", "Notes", "Created"]
     
+    conn = sqlite3.connect(f"{DB_PATH.resolve().as_uri()}?mode=ro", uri=True)
+    cursor = conn.execute('''
+        SELECT id, name, role, company, email, source, priority, status, notes, created_at
+        FROM prospects ORDER BY id
+    ''')
     with open(filepath, 'w', newline='') as f:
         writer = csv.writer(f, delimiter='\t')
         writer.writerow(headers)
-        for p in data["prospects"]:
-            writer.writerow([
-                p["id"],
-                p["name"],
-                p["role"],
-                p["company"],
-                p["email"],
-                p["source"],
-                p["priority"],
-                p["status"],
-                p["notes"][:200] if p["notes"] else "",
-                p["created_at"][:10]
-            ])
+        writer.writerows(_tsv_rows(cursor))
+    total = conn.execute('SELECT total FROM stats').fetchone()[0]
+    conn.close()
     
     print(f"\n📊 TSV exported to: {filepath}")
-    print(f"   {len(data['prospects'])} prospects ready for import")
+    print(f"   {total} prospects ready for import")
     return filepath
 
+# The whole prospects.json document, assembled by SQLite's JSON functions
+_EXPORT_JSON_SQL = '''
+    SELECT json_object(
+        'last_updated', ?,
+        'prospects', (
+            SELECT json_group_array(json_object(
+                'id', id, 'name', name, 'role', role, 'company', company,
+                'email', email, 'source', source, 'notes', notes,
+                'priority', priority, 'status', status,
+                'created_at', created_at, 'updated_at', updated_at))
+            FROM (SELECT * FROM prospects ORDER BY id)
+        ),
+        'stats', (
+            SELECT json_object('total', total, 'contacted', contacted,
+                               'replied', replied, 'meetings', meetings)
+            FROM stats
+        )
+    )
+'''
+
+def export_json(path=PROSPECTS_FILE, pretty=False):
+    """Write all prospects in the legacy prospects.json layout
+
+    SQLite builds the document and it is written out as returned.
+    pretty=True, or an SQLite without JSON support, builds it in Python.
+    """
+    now = datetime.now().isoformat()
+    conn = get_connection()
+    raw = None
+    if not pretty:
+        try:
+            raw = conn.execute(_EXPORT_JSON_SQL, (now,)).fetchone()[0].encode()
+        except sqlite3.OperationalError:
+            pass  # Built without JSON1
+    if raw is None:
+        conn.row_factory = sqlite3.Row
+        data = {
+            "last_updated": now,
+            "prospects": [dict(row) for row in conn.execute('SELECT * FROM prospects ORDER BY id')],
+            "stats": dict(conn.execute('SELECT total, contacted, replied, meetings FROM stats').fetchone())
+        }
+        raw = dumps(data, pretty)
+    conn.close()
+    
+    write_bytes(Path(path), raw)
+    
+    print(f"\n📄 JSON exported to: {path}")
+    return path
+
 def show_status():
     """Show prospect tracking status"""
-    data = load_prospects()
-    last_updated = data.get("last_updated")
+    conn = get_connection()
+    total, contacted, replied, meetings, last_updated = conn.execute('SELECT * FROM stats').fetchone()
+    recent = conn.execute('''
+        SELECT name, role, company, source, status FROM prospects ORDER BY id DESC LIMIT 5
+    ''').fetchall()
+    conn.close()
     
     print(f"\n📊 Prospect Tracker")
     print(f"   Last updated: {last_updated[:19] if last_updated else 'Never'}")
-    print(f"   Total prospects: {data['stats']['total']}")
-    print(f"   Contacted: {data['stats']['contacted']}")
-    print(f"   Replied: {data['stats']['replied']}")
-    print(f"   Meetings: {data['stats']['meetings']}")
+    print(f"   Total prospects: {total}")
+    print(f"   Contacted: {contacted}")
+    print(f"   Replied: {replied}")
+    print(f"   Meetings: {meetings}")
     
     # Show recent prospects
-    if data["prospects"]:
+    if recent:
         print(f"\n📋 Recent Prospects:")
-        for p in data["prospects"][-5:]:
-            status_emoji = {"new": "🆕", "contacted": "📧", "replied": "✅", "meeting": "📅", "won": "🎉", "lost": "❌"}
-            emoji = status_emoji.get(p["status"], "📋")
-            print(f"   {emoji} {p['name']} ({p['role']} at {p['company']}) - {p['source']}")
+        for name, role, company, source, status in reversed(recent):
+            emoji = _STATUS_EMOJI.get(status, "📋")
+            print(f"   {emoji} {name} ({role} at {company}) - {source}")
 
-def main():
-    import sys
-    
-    if len(sys.argv) > 1:
-        cmd = sys.argv[1]
-        
-        if cmd == "--status" or cmd == "status":
-            show_status()
-            return
-        
-        if cmd == "--export" or cmd == "export":
-            generate_tsv()
-            return
-        
-        if cmd == "add":
-            if len(sys.argv) > 6:
-                name = sys.argv[2]
-                role = sys.argv[3]
-                company = sys.argv[4]
-                email = sys.argv[5]
-                source = sys.argv[6] if len(sys.argv) > 6 else "manual"
-                notes = sys.argv[7] if len(sys.argv) > 7 else ""
-                priority = sys.argv[8] if len(sys.argv) > 8 else "medium"
-                add_prospect(name, role, company, email, source, notes, priority)
-            else:
-                print("Usage: python3 prospect_tracker.py add \"Name\" \"Role\" \"Company\" \"email@example.com\" \"source\" [notes] [priority]")
-            return
-        
-        if cmd == "--update":
-            if len(sys.argv) > 3:
-                update_status(int(sys.argv[2]), sys.argv[3])
-            else:
-                print("Usage: python3 prospect_tracker.py --update <id> <new_status>")
-            return
-        
-        if cmd == "--help" or cmd == "help":
-            print("""
+def _cmd_add(args):
+    if len(args) > 4:
+        name, role, company, email, source = args[:5]
+        notes = args[5] if len(args) > 5 else ""
+        priority = args[6] if len(args) > 6 else "medium"
+        add_prospect_fast(name, role, company, email, source, notes, priority)
+        print(f"  ✅ Added: {name} ({role} at {company})")
+    else:
+        print("Usage: python3 prospect_tracker.py add \"Name\" \"Role\" \"Company\" \"email@example.com\" \"source\" [notes] [priority]")
+
+def _cmd_update(args):
+    if len(args) > 1:
+        update_status(int(args[0]), args[1])
+    else:
+        print("Usage: python3 prospect_tracker.py --update <id> <new_status>")
+
+def _cmd_import(args):
+    if args:
+        import_json(args[0])
+    else:
+        print("Usage: python3 prospect_tracker.py import <file.json>")
+
+def _cmd_help(args):
+    print("""
 Prospect Tracker Commands:
   python3 prospect_tracker.py status          - Show tracking status
   python3 prospect_tracker.py export          - Generate TSV for Google Sheets
+  python3 prospect_tracker.py export-json [--pretty] - Write prospects.json from the database
+  python3 prospect_tracker.py import <file.json>      - Bulk-import prospects from JSON
   python3 prospect_tracker.py add "Name" "Role" "Company" "email" "source" [notes] [priority]
   python3 prospect_tracker.py --update <id> <status>
   
@@ -185,10 +354,32 @@ Import to Google Sheets:
   2. File → Import → Upload → select prospects_outreach.tsv
   3. Separator: Tab, Import action: Create new spreadsheet
 """)
-            return
-    
+
+def _cmd_default(args):
     show_status()
     print("\n💡 Run 'python3 prospect_tracker.py export' to generate TSV for Google Sheets")
 
+# Older --flag spellings stay next to the plain names; anything else shows status
+COMMANDS = {
+    "status": lambda args: show_status(),
+    "--status": lambda args: show_status(),
+    "export": lambda args: generate_tsv(),
+    "--export": lambda args: generate_tsv(),
+    "export-json": lambda args: export_json(pretty="--pretty" in args),
+    "import": _cmd_import,
+    "add": _cmd_add,
+    "--update": _cmd_update,
+    "help": _cmd_help,
+    "--help": _cmd_help,
+}
+
+def main():
+    import sys
+    
+    init_db()
+    
+    cmd = sys.argv[1] if len(sys.argv) > 1 else None
+    COMMANDS.get(cmd, _cmd_default)(sys.argv[2:])
+
 if __name__ == '__main__':
     main()
@@ -3,53 +3,98 @@
 Task Tracker - A simple CLI task management app
 """
 
+import atexit
 import sqlite3
 import sys
 from datetime import datetime
 from pathlib import Path
 
-DB_PATH = Path(__name__).parent / "tasks.db"
+import autonomous_tracker
+from autonomous_tracker import TaskStatus, status_code, status_name
+
+DB_PATH = Path(__file__).resolve().parent / "tasks.db"
+# Earlier versions opened tasks.db relative to the working directory
+LEGACY_DB_PATH = Path("tasks.db")
+
+# Fixed statement text for the common writes, so no SQL is built per call
+_INSERT_SQL = 'INSERT INTO tasks (title, description, priority, created_at, updated_at) VALUES (?, ?, ?, ?, ?)'
+_UPDATE_FIELD_SQL = {
+    field: f'UPDATE tasks SET {field} = ?, updated_at = ? WHERE id = ?'
+    for field in ('title', 'description', 'status', 'priority')
+}
+
+# Per-connection tuning. journal_mode=WAL is stored in the database file,
+# so init_db() sets it once rather than on every connect.
+_PRAGMAS = [
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+]
+
+# One connection per process, opened by get_connection() and closed at exit
+_CONN = None
+
+def _move_legacy_db():
+    """Move a tasks.db created in the working directory next to this script"""
+    legacy = LEGACY_DB_PATH.resolve()
+    if legacy == DB_PATH or not legacy.exists() or DB_PATH.exists():
+        return
+    import shutil
+    # Bring the WAL along too, it may hold commits not yet checkpointed
+    for suffix in ("", "-wal", "-shm"):
+        src = legacy.with_name(legacy.name + suffix)
+        if src.exists():
+            shutil.move(src, DB_PATH.with_name(DB_PATH.name + suffix))
+    print(f"Moved {legacy} to {DB_PATH}")
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            status TEXT DEFAULT 'pending',
-            priority TEXT DEFAULT 'medium',
-            created_at TEXT,
-            updated_at TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    """Prepare tasks.db; the tasks table is shared with autonomous_tracker, which owns its schema
+
+    Statuses are therefore stored as autonomous_tracker's TaskStatus codes.
+    """
+    _move_legacy_db()
+    autonomous_tracker.init_db()
 
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    """Return the process-wide connection, opening it on first use"""
+    global _CONN
+    if _CONN is None:
+        _CONN = sqlite3.connect(DB_PATH)
+        for pragma in _PRAGMAS:
+            _CONN.execute(pragma)
+        atexit.register(_CONN.close)
+    return _CONN
 
 def add_task(title, description="", priority="medium"):
     conn = get_connection()
     c = conn.cursor()
     now = datetime.now().isoformat()
-    c.execute('INSERT INTO tasks (title, description, priority, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
-              (title, description, priority, now, now))
+    c.execute(_INSERT_SQL, (title, description, priority, now, now))
     task_id = c.lastrowid
     conn.commit()
-    conn.close()
     print(f"✓ Task created: {title} (ID: {task_id})")
 
+def add_tasks_many(rows):
+    """Add (title, description, priority) rows in a single transaction, stamped with one timestamp"""
+    conn = get_connection()
+    c = conn.cursor()
+    now = datetime.now().isoformat()
+    params = [(title, description, priority, now, now) for title, description, priority in rows]
+    c.executemany(_INSERT_SQL, params)
+    conn.commit()
+    print(f"✓ Created {len(params)} tasks")
+    return len(params)
+
 def list_tasks(status=None):
     conn = get_connection()
     c = conn.cursor()
     if status:
-        c.execute('SELECT * FROM tasks WHERE status = ? ORDER BY created_at DESC', (status,))
+        c.execute('SELECT id, title, status, priority FROM tasks WHERE status = ? ORDER BY created_at DESC',
+                  (status_code(status),))
     else:
-        c.execute('SELECT * FROM tasks ORDER BY created_at DESC')
+        c.execute('SELECT id, title, status, priority FROM tasks ORDER BY created_at DESC')
     tasks = c.fetchall()
-    conn.close()
     
     if not tasks:
         print("No tasks found.")
@@ -57,46 +102,43 @@ def list_tasks(status=None):
     
     print(f"\n{'ID':<4} {'Status':<10} {'Priority':<8} {'Title':<30}")
     print("-" * 60)
-    for task in tasks:
-        print(f"{task[0]:<4} {task[3]:<10} {task[4]:<8} {task[1][:28]:<30}")
+    for task_id, title, task_status, priority in tasks:
+        print(f"{task_id:<4} {status_name(task_status):<10} {priority:<8} {title[:28]:<30}")
 
 def update_task(task_id, title=None, description=None, status=None, priority=None):
     conn = get_connection()
     c = conn.cursor()
-    updates = []
-    values = []
     now = datetime.now().isoformat()
     
+    fields = {}
     if title:
-        updates.append('title = ?')
-        values.append(title)
+        fields['title'] = title
     if description is not None:
-        updates.append('description = ?')
-        values.append(description)
-    if status:
-        updates.append('status = ?')
-        values.append(status)
+        fields['description'] = description
+    if status is not None:
+        fields['status'] = status_code(status) if isinstance(status, str) else status
     if priority:
-        updates.append('priority = ?')
-        values.append(priority)
-    updates.append('updated_at = ?')
-    values.append(now)
-    values.append(task_id)
+        fields['priority'] = priority
     
-    if updates:
-        c.execute(f'UPDATE tasks SET {", ".join(updates)} WHERE id = ?', values)
-        conn.commit()
-        print(f"✓ Task {task_id} updated")
+    if len(fields) == 1:
+        # Common case (e.g. 'done'): one field, prebuilt statement
+        (field, value), = fields.items()
+        sql = _UPDATE_FIELD_SQL[field]
+        values = [value, now, task_id]
     else:
-        print("No changes made.")
-    conn.close()
+        updates = [f'{field} = ?' for field in fields] + ['updated_at = ?']
+        sql = f'UPDATE tasks SET {", ".join(updates)} WHERE id = ?'
+        values = list(fields.values()) + [now, task_id]
+    
+    c.execute(sql, values)
+    conn.commit()
+    print(f"✓ Task {task_id} updated")
 
 def delete_task(task_id):
     conn = get_connection()
     c = conn.cursor()
     c.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
     conn.commit()
-    conn.close()
     print(f"✓ Task {task_id} deleted")
 
 def show_help():
@@ -119,94 +161,89 @@ Examples:
 def show_task(task_id):
     conn = get_connection()
     c = conn.cursor()
-    c.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
+    c.execute('SELECT id, title, description, status, priority, created_at, updated_at FROM tasks WHERE id = ?',
+              (task_id,))
     task = c.fetchone()
-    conn.close()
     
     if task:
         print(f"\nTask #{task[0]}")
         print(f"Title: {task[1]}")
         print(f"Description: {task[2] or '(none)'}")
-        print(f"Status: {task[3]}")
+        print(f"Status: {status_name(task[3])}")
         print(f"Priority: {task[4]}")
         print(f"Created: {task[5]}")
         print(f"Updated: {task[6]}")
     else:
         print(f"Task {task_id} not found.")
 
-def main():
-    init_db()
-    
-    args = sys.argv[1:]
-    
-    if not args or args[0] == 'help':
-        show_help()
+def _cmd_add(args):
+    if not args:
+        print("Error: 'add' requires a title")
         return
+    title = args[0]
+    description = ""
+    priority = "medium"
     
-    cmd = args[0]
-    
-    if cmd == 'add':
-        if len(args) < 2:
-            print("Error: 'add' requires a title")
-            return
-        title = args[1]
-        description = ""
-        priority = "medium"
-        
-        # Parse remaining args
-        i = 2
-        while i < len(args):
-            if args[i] == '--priority' and i + 1 < len(args):
-                priority = args[i + 1].lower()
-                i += 2
+    # Parse remaining args
+    i = 1
+    while i < len(args):
+        if args[i] == '--priority' and i + 1 < len(args):
+            priority = args[i + 1].lower()
+            i += 2
+        else:
+            if description:
+                description += " " + args[i]
             else:
-                if description:
-                    description += " " + args[i]
-                else:
-                    description = args[i]
-                i += 1
-        
-        add_task(title, description, priority)
-    
-    elif cmd == 'list':
-        status = args[1] if len(args) > 1 else None
-        if status and status not in ['pending', 'completed']:
-            status = None
-        list_tasks(status if status else None)
+                description = args[i]
+            i += 1
     
-    elif cmd == 'done':
-        if len(args) < 2:
-            print("Error: 'done' requires a task ID")
+    add_task(title, description, priority)
+
+def _cmd_list(args):
+    status = args[0] if args else None
+    if status and status not in ['pending', 'completed']:
+        status = None
+    list_tasks(status if status else None)
+
+def _task_id_command(name, action):
+    """Handler for commands taking a single task ID argument"""
+    def handler(args):
+        if not args:
+            print(f"Error: '{name}' requires a task ID")
             return
         try:
-            task_id = int(args[1])
-            update_task(task_id, status='completed')
+            task_id = int(args[0])
         except ValueError:
             print("Error: Task ID must be a number")
-    
-    elif cmd == 'delete':
-        if len(args) < 2:
-            print("Error: 'delete' requires a task ID")
             return
-        try:
-            task_id = int(args[1])
-            delete_task(task_id)
-        except ValueError:
-            print("Error: Task ID must be a number")
+        action(task_id)
+    return handler
+
+# Handlers take the words after the command; main() prints help for anything else
+COMMANDS = {
+    'add': _cmd_add,
+    'list': _cmd_list,
+    'done': _task_id_command('done', lambda task_id: update_task(task_id, status=TaskStatus.DONE)),
+    'delete': _task_id_command('delete', delete_task),
+    'show': _task_id_command('show', show_task),
+    'help': lambda args: show_help(),
+}
+
+def main():
+    init_db()
     
-    elif cmd == 'show':
-        if len(args) < 2:
-            print("Error: 'show' requires a task ID")
-            return
-        try:
-            task_id = int(args[1])
-            show_task(task_id)
-        except ValueError:
-            print("Error: Task ID must be a number")
+    args = sys.argv[1:]
     
-    else:
-        print(f"Unknown command: {cmd}")
+    if not args:
         show_help()
+        return
+    
+    handler = COMMANDS.get(args[0])
+    if handler is None:
+        print(f"Unknown command: {args[0]}")
+        show_help()
+        return
+    handler(args[1:])
 
 if __name__ == '__main__':
     main()
@@ -12,31 +12,44 @@ Usage:
     python3 telegram_scraper.py --scrape
 """
 
-import json
-import subprocess
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 
+from json_store import CachedLoader, loads, write_json
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 CHANNELS_FILE = SCRIPT_DIR / "telegram_channels.json"
 PROSPECTS_FILE = SCRIPT_DIR / "prospects.json"
 
-def load_channels():
-    """Load tracked Telegram channels"""
+_STATUS_EMOJI = {"pending": "⏳", "scraped": "✅", "error": "❌"}
+
+def _read_channels():
     if CHANNELS_FILE.exists():
-        with open(CHANNELS_FILE, 'r') as f:
-            return json.load(f)
+        return loads(CHANNELS_FILE.read_bytes())
     return {
         "channels": [],
-        "last_scrape": None
+        "last_scrape": None,
+        "_next_id": 1
     }
 
+# Parsed telegram_channels.json, reused until the file's mtime changes
+_CACHE = CachedLoader((CHANNELS_FILE,), _read_channels)
+
+def load_channels():
+    """Load tracked Telegram channels (cached until the file changes)"""
+    return _CACHE.get()
+
 def save_channels(data):
     """Save channels"""
     data["last_scrape"] = datetime.now().isoformat()
-    with open(CHANNELS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    write_json(CHANNELS_FILE, data)
+    _CACHE.store(data)
+
+def invalidate_cache():
+    """Forget the parsed telegram_channels.json, e.g. after another process edits it"""
+    _CACHE.invalidate()
 
 def add_channel(channel_username, category="crypto"):
     """Add a channel to track"""
@@ -53,8 +66,12 @@ def add_channel(channel_username, category="crypto"):
             print(f"  ⏭️  Already tracking: {c['username']}")
             return
     
+    # Files written before _next_id existed fall back to the highest id in use
+    channel_id = data.get("_next_id") or max((c["id"] for c in data["channels"]), default=0) + 1
+    data["_next_id"] = channel_id + 1
+    
     channel = {
-        "id": len(data["channels"]) + 1,
+        "id": channel_id,
         "username": username,
         "link": f"https://t.me/{username}",
         "category": category,
@@ -80,14 +97,10 @@ def add_prospect(name, role, company, source_channel, notes=""):
         "priority": "medium"
     }
     
-    # Use the main prospect tracker
-    cmd = [
-        "python3", str(SCRIPT_DIR / "prospect_tracker.py"),
-        "add", name, role, company, "", source_channel, notes, "medium"
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode == 0:
-        print(f"  ✅ Added to prospect tracker: {name}")
+    # Use the main prospect tracker (imported here so other commands skip sqlite3)
+    import prospect_tracker
+    prospect_tracker.init_db()
+    prospect_tracker.add_prospect(name, role, company, "", source_channel, notes, "medium")
     return prospect
 
 def list_channels():
@@ -98,18 +111,14 @@ def list_channels():
     print(f"   Last scrape: {data.get('last_scrape', 'Never')[:19] or 'Never'}")
     
     # Group by category
-    by_category = {}
+    by_category = defaultdict(list)
     for c in data["channels"]:
-        cat = c.get("category", "other")
-        if cat not in by_category:
-            by_category[cat] = []
-        by_category[cat].append(c)
+        by_category[c.get("category", "other")].append(c)
     
     for cat, channels in by_category.items():
         print(f"\n   {cat.upper()} ({len(channels)}):")
         for c in channels:
-            status_emoji = {"pending": "⏳", "scraped": "✅", "error": "❌"}
-            emoji = status_emoji.get(c["status"], "📋")
+            emoji = _STATUS_EMOJI.get(c["status"], "📋")
             print(f"      {emoji} {c['username']} - {c.get('member_count', 'N/A')} members")
 
 def scrape_channels():
@@ -134,43 +143,25 @@ def scrape_channels():
     print(f"\n  📊 Processed {scraped_count} channels")
     print(f"  💡 For full member data, configure Telegram API credentials")
 
-def main():
-    import sys
-    
-    if len(sys.argv) > 1:
-        cmd = sys.argv[1]
-        
-        if cmd == "--list" or cmd == "list":
-            list_channels()
-            return
-        
-        if cmd == "--scrape" or cmd == "scrape":
-            scrape_channels()
-            return
-        
-        if cmd == "--add" or cmd == "add":
-            if len(sys.argv) > 2:
-                channel = sys.argv[2]
-                category = sys.argv[3] if len(sys.argv) > 3 else "crypto"
-                add_channel(channel, category)
-            else:
-                print("Usage: python3 telegram_scraper.py --add <channel_username> [category]")
-            return
-        
-        if cmd == "--add-prospect":
-            if len(sys.argv) > 4:
-                name = sys.argv[2]
-                role = sys.argv[3]
-                company = sys.argv[4]
-                source = sys.argv[5] if len(sys.argv) > 5 else "telegram"
-                notes = sys.argv[6] if len(sys.argv) > 6 else ""
-                add_prospect(name, role, company, source, notes)
-            else:
-                print("Usage: python3 telegram_scraper.py --add-prospect \"Name\" \"Role\" \"Company\" [channel] [notes]")
-            return
-        
-        if cmd == "--help" or cmd == "help":
-            print("""
+def _cmd_add(args):
+    if args:
+        channel = args[0]
+        category = args[1] if len(args) > 1 else "crypto"
+        add_channel(channel, category)
+    else:
+        print("Usage: python3 telegram_scraper.py --add <channel_username> [category]")
+
+def _cmd_add_prospect(args):
+    if len(args) > 2:
+        name, role, company = args[:3]
+        source = args[3] if len(args) > 3 else "telegram"
+        notes = args[4] if len(args) > 4 else ""
+        add_prospect(name, role, company, source, notes)
+    else:
+        print("Usage: python3 telegram_scraper.py --add-prospect \"Name\" \"Role\" \"Company\" [channel] [notes]")
+
+def _cmd_help(args):
+    print("""
 Telegram Channel Scraper Commands:
   python3 telegram_scraper.py --add <username> [category]  - Add channel to track
   python3 telegram_scraper.py --list                         - List tracked channels
@@ -190,10 +181,29 @@ Channels to Track:
   
 Note: Full member scraping requires Telegram API credentials (telethon/pyrogram)
 """)
-            return
-    
+
+def _cmd_default(args):
     list_channels()
     print("\n💡 Use --add to track new channels")
 
+# Plain and --prefixed spellings of a command share one handler
+COMMANDS = {
+    "list": lambda args: list_channels(),
+    "--list": lambda args: list_channels(),
+    "scrape": lambda args: scrape_channels(),
+    "--scrape": lambda args: scrape_channels(),
+    "add": _cmd_add,
+    "--add": _cmd_add,
+    "--add-prospect": _cmd_add_prospect,
+    "help": _cmd_help,
+    "--help": _cmd_help,
+}
+
+def main():
+    import sys
+    
+    cmd = sys.argv[1] if len(sys.argv) > 1 else None
+    COMMANDS.get(cmd, _cmd_default)(sys.argv[2:])
+
 if __name__ == '__main__':
     main()
@@ -7,72 +7,159 @@ This script generates queries for Evan to search. The actual search is done
 via the agent's web_search tool for best results.
 """
 
-import json
-import subprocess
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
 
+from json_store import CachedLoader, dumps, loads, write_json
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 SUBMISSIONS_FILE = SCRIPT_DIR / "submissions.json"
-TASK_TRACKER = SCRIPT_DIR / "task_tracker.py"
+# Append-only NDJSON log of opportunities added since submissions.json
+# was last written; replayed on load and folded in by compact(). Entries
+# are numbered, and the snapshot's "_log_seq" records the last one it
+# already contains, so replaying a log that outlived its snapshot write
+# is harmless.
+SUBMISSIONS_LOG = SCRIPT_DIR / "submissions.log"
 
-def load_submissions():
-    """Load existing submissions from JSON"""
+def _read_submissions():
     if SUBMISSIONS_FILE.exists():
-        with open(SUBMISSIONS_FILE, 'r') as f:
-            return json.load(f)
-    return {
-        "last_check": None,
-        "opportunities": [],
-        "submitted": []
-    }
+        data = loads(SUBMISSIONS_FILE.read_bytes())
+    else:
+        data = {
+            "last_check": None,
+            "opportunities": [],
+            "submitted": []
+        }
+    _replay_log(data)
+    return data
+
+# Parsed submissions (snapshot + log), reused until either file's mtime changes
+_CACHE = CachedLoader((SUBMISSIONS_FILE, SUBMISSIONS_LOG), _read_submissions)
+
+def load_submissions():
+    """Load existing submissions from JSON plus the append log (cached until either changes)"""
+    return _CACHE.get()
+
+def _replay_log(data):
+    """Apply the entries of submissions.log on top of a loaded snapshot"""
+    if not SUBMISSIONS_LOG.exists():
+        return
+    # Only the snapshot's own mark says what it holds; processes appending
+    # concurrently can number different entries alike
+    snapshot_seq = last_seq = data.get("_log_seq", 0)
+    with open(SUBMISSIONS_LOG, 'rb') as f:
+        for line in f:
+            try:
+                entry = loads(line)
+            except ValueError:
+                continue  # Torn line from an interrupted append
+            seq = entry.get("seq", 0)
+            if seq and seq <= snapshot_seq:
+                continue  # Already part of the snapshot
+            if entry["op"] == "add":
+                data["opportunities"].append(entry["opp"])
+            last_seq = max(last_seq, seq)
+    data["_log_seq"] = last_seq
+
+def _append_log(data, opps):
+    """Record newly added opportunities by appending to the log, not rewriting the snapshot"""
+    with open(SUBMISSIONS_LOG, 'a+b') as f:
+        # Start on a fresh line if an interrupted append left a partial one
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        seq = data.get("_log_seq", 0)
+        entries = []
+        for seq, opp in enumerate(opps, seq + 1):
+            entries.append(dumps({"seq": seq, "op": "add", "opp": opp}) + b"\n")
+        f.write(b"".join(entries))
+    data["_log_seq"] = seq
+    if data is _CACHE.data:
+        _CACHE.store(data)
 
 def save_submissions(data):
-    """Save submissions to JSON"""
-    with open(SUBMISSIONS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    """Save submissions to JSON, folding in (and clearing) the append log
+
+    The snapshot carries "_log_seq", so a crash before the log is removed
+    does not replay its entries a second time.
+    """
+    write_json(SUBMISSIONS_FILE, data)
+    SUBMISSIONS_LOG.unlink(missing_ok=True)
+    _CACHE.store(data)
+
+def compact():
+    """Rewrite submissions.json with everything in the log and truncate the log"""
+    save_submissions(load_submissions())
+
+def invalidate_cache():
+    """Forget the parsed snapshot and log, e.g. after another process compacts them"""
+    _CACHE.invalidate()
+
+def add_tasks(rows):
+    """Add (title, description, priority) rows to the tracker in one transaction"""
+    import task_tracker  # Only needed when a task is created; keeps the read-only commands light
+    task_tracker.init_db()
+    task_tracker.add_tasks_many([(title, description, priority.lower())
+                                 for title, description, priority in rows])
 
 def add_task(title, description, priority="medium"):
     """Add a task to the tracker"""
-    cmd = [
-        "python3", str(TASK_TRACKER), "add",
-        title, description, "--priority", priority
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    return result.stdout.strip()
+    add_tasks([(title, description, priority)])
 
-def is_duplicate(opp):
-    """Check if opportunity already tracked"""
-    data = load_submissions()
-    for existing in data.get("submitted", []):
-        if existing.get("url") == opp.get("url"):
-            return True
-    return False
+def submitted_urls(data):
+    """Set of URLs of the opportunities already submitted"""
+    return {existing.get("url") for existing in data.get("submitted", [])}
+
+def is_duplicate(opp, data=None, urls=None):
+    """Check if opportunity already tracked
 
-def log_opportunity(opp):
+    Pass urls (from submitted_urls()) to check many opportunities
+    without rebuilding the set each time.
+    """
+    if urls is None:
+        urls = submitted_urls(data if data is not None else load_submissions())
+    return opp.get("url") in urls
+
+def log_opportunity(opp, data=None):
     """Log opportunity and create task"""
-    data = load_submissions()
+    log_opportunities([opp], data)
+
+def log_opportunities(opps, data=None):
+    """Log a batch of opportunities with one load and one log append, creating a task for each"""
+    if data is None:
+        data = load_submissions()
     
-    # Check for duplicates
-    if is_duplicate(opp):
-        print(f"  ⏭️  Skipping duplicate: {opp['title'][:40]}...")
-        return
+    urls = submitted_urls(data)
+    logged = []
+    for opp in opps:
+        # Check for duplicates, including repeats within this batch
+        if is_duplicate(opp, urls=urls):
+            print(f"  ⏭️  Skipping duplicate: {opp['title'][:40]}...")
+            continue
+        data["opportunities"].append(opp)
+        logged.append(opp)
+        if opp.get("url"):
+            urls.add(opp["url"])
+        print(f"  ✅ Found: {opp['title'][:50]}...")
     
-    data["opportunities"].append(opp)
-    save_submissions(data)
+    if not logged:
+        return logged
+    _append_log(data, logged)
     
-    print(f"  ✅ Found: {opp['title'][:50]}...")
-    
-    # Create task for this opportunity
-    task_result = add_task(
+    # Create a task for each new opportunity
+    add_tasks([(
         f"Apply: {opp['title'][:50]}",
         f"{opp.get('description', '')[:100]}... Source: {opp.get('source', 'unknown')}",
         opp.get("priority", "medium")
-    )
+    ) for opp in logged])
+    return logged
 
-def add_manual_opportunity(title, description, url, source="manual", priority="medium"):
+def add_manual_opportunity(title, description, url, source="manual", priority="medium", data=None):
     """Add an opportunity manually (from agent's web search)"""
     opp = {
         "title": title,
@@ -82,11 +169,12 @@ def add_manual_opportunity(title, description, url, source="manual", priority="m
         "date": datetime.now().isoformat(),
         "priority": priority
     }
-    log_opportunity(opp)
+    log_opportunity(opp, data)
 
-def run_search():
+def run_search(data=None):
     """Main search function - generates queries for agent to search"""
-    data = load_submissions()
+    if data is None:
+        data = load_submissions()
     data["last_check"] = datetime.now().isoformat()
     
     print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 🔍 Web3 Opportunity Scanner")
@@ -115,73 +203,83 @@ def run_search():
     
     save_submissions(data)
 
-def main():
-    data = load_submissions()
-    
-    if len(sys.argv) > 1:
-        cmd = sys.argv[1]
-        
-        if cmd == "--status":
-            print(f"\n📊 Web3 Opportunity Tracker")
-            print(f"Last check: {data.get('last_check', 'Never')}")
-            print(f"Tracked: {len(data['opportunities'])}")
-            print(f"Submitted: {len(data['submitted'])}")
-            return
-        
-        if cmd == "--submit":
-            # Mark an opportunity as submitted
-            if len(sys.argv) > 2:
-                title = " ".join(sys.argv[2:])
-                data = load_submissions()
-                for opp in data["opportunities"]:
-                    if opp["title"] in title or title in opp["title"]:
-                        data["submitted"].append({
-                            **opp,
-                            "submitted_at": datetime.now().isoformat()
-                        })
-                        data["opportunities"].remove(opp)
-                        save_submissions(data)
-                        print(f"✅ Marked as submitted: {opp['title'][:50]}")
-                        return
-            print("Usage: python3 web3_scraper.py --submit <task title>")
-            return
-        
-        if cmd == "add":
-            # Add opportunity from command line
-            if len(sys.argv) > 3:
-                title = sys.argv[2]
-                description = sys.argv[3]
-                url = sys.argv[4] if len(sys.argv) > 4 else ""
-                source = sys.argv[5] if len(sys.argv) > 5 else "manual"
-                priority = sys.argv[6] if len(sys.argv) > 6 else "medium"
-                add_manual_opportunity(title, description, url, source, priority)
-            else:
-                print("Usage: python3 web3_scraper.py add \"Title\" \"Description\" [url] [source] [priority]")
-            return
-        
-        if cmd == "--list":
-            print(f"\n📋 Tracked Opportunities:")
-            for opp in data.get("opportunities", []):
-                status = "🔴" if opp.get("priority") == "high" else "🟡"
-                print(f"  {status} {opp['title'][:50]}")
-            return
-        
-        if cmd == "--help":
-            print("""
+def _cmd_status(args, data):
+    print(f"\n📊 Web3 Opportunity Tracker")
+    print(f"Last check: {data.get('last_check', 'Never')}")
+    print(f"Tracked: {len(data['opportunities'])}")
+    print(f"Submitted: {len(data['submitted'])}")
+
+def _cmd_submit(args, data):
+    # Mark an opportunity as submitted
+    if args:
+        title = " ".join(args)
+        for opp in data["opportunities"]:
+            if opp["title"] in title or title in opp["title"]:
+                data["submitted"].append({
+                    **opp,
+                    "submitted_at": datetime.now().isoformat()
+                })
+                data["opportunities"].remove(opp)
+                save_submissions(data)
+                print(f"✅ Marked as submitted: {opp['title'][:50]}")
+                return
+    print("Usage: python3 web3_scraper.py --submit <task title>")
+
+def _cmd_add(args, data):
+    # Add opportunity from command line
+    if len(args) > 1:
+        title, description = args[:2]
+        url = args[2] if len(args) > 2 else ""
+        source = args[3] if len(args) > 3 else "manual"
+        priority = args[4] if len(args) > 4 else "medium"
+        add_manual_opportunity(title, description, url, source, priority, data)
+    else:
+        print("Usage: python3 web3_scraper.py add \"Title\" \"Description\" [url] [source] [priority]")
+
+def _cmd_compact(args, data):
+    compact()
+    print("✅ Compacted submissions.log into submissions.json")
+
+def _cmd_list(args, data):
+    print(f"\n📋 Tracked Opportunities:")
+    for opp in data.get("opportunities", []):
+        status = "🔴" if opp.get("priority") == "high" else "🟡"
+        print(f"  {status} {opp['title'][:50]}")
+
+def _cmd_help(args, data):
+    print("""
 Web3 Opportunity Scraper Commands:
   python3 web3_scraper.py              - Run scanner, show queries
   python3 web3_scraper.py --status     - Show tracker status
   python3 web3_scraper.py --list       - List tracked opportunities
   python3 web3_scraper.py add "Title" "Desc" [url] [source] [priority]
   python3 web3_scraper.py --submit "Title" - Mark as submitted
+  python3 web3_scraper.py --compact    - Fold submissions.log into submissions.json
   
 Examples:
   python3 web3_scraper.py add "ETHGlobal Tokyo" "Hackathon in Tokyo" https://ethglobal.com ethglobal high
   python3 web3_scraper.py --submit "ETHGlobal Tokyo"
 """)
-            return
+
+def _cmd_scan(args, data):
+    run_search(data)
+
+# Handlers get the words after the command plus the submissions main()
+# loaded once, so they can read or extend them without another load
+COMMANDS = {
+    "--status": _cmd_status,
+    "--submit": _cmd_submit,
+    "add": _cmd_add,
+    "--compact": _cmd_compact,
+    "--list": _cmd_list,
+    "--help": _cmd_help,
+}
+
+def main():
+    data = load_submissions()
     
-    run_search()
+    cmd = sys.argv[1] if len(sys.argv) > 1 else None
+    COMMANDS.get(cmd, _cmd_scan)(sys.argv[2:], data)
 
 if __name__ == '__main__':
     main()